@@ -1,12 +1,30 @@
+import numpy as np
 import pandas as pd
+import codecs
+import importlib.util
+import io
+import json
 import os
 import shutil
 import subprocess
 import sys
-import zipfile
+import time
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Set, Tuple, Optional, Any, Dict
+from typing import List, Set, FrozenSet, Tuple, Optional, Any, Dict, Callable, Iterable, TextIO
+
+# Rarely used modules (zipfile for exports) are imported where they are needed; python-calamine
+# is only probed here and loaded by pandas on first read.
+# pandas only ships the 'calamine' engine from 2.2 on; older versions fall back to openpyxl.
+HAS_CALAMINE: bool = (importlib.util.find_spec('python_calamine') is not None
+                      and tuple(int(part) for part in pd.__version__.split('.')[:2]) >= (2, 2))
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # ==============================================================================
 # --- CONFIGURATION & CONSTANTS ---
@@ -14,6 +32,25 @@ from typing import List, Set, Tuple, Optional, Any, Dict
 EXCEL_FILE: str = 'config.xlsx'
 TFVARS_DIR: str = 'tfvars'
 MODULES_DIR: str = 'modules'
+STATE_DIR: str = 'terraform.tfstate.d'
+WORKSPACE_CACHE_TTL: float = 30.0
+APPLY_MAX_WORKERS: int = 8
+READ_CHUNK_SIZE: int = 65536
+# zlib level for export bundles: 1 is several times faster than the default 6 at a small size cost.
+EXPORT_COMPRESSLEVEL: int = 1
+EXPORT_READ_WORKERS: int = 8
+# Terraform tuning for plan/apply. TF_SKIP_REFRESH only takes effect for LBs that already have
+# state (a first-ever apply always refreshes) and is never used for plan, which exists to detect drift.
+TF_PARALLELISM: int = 10
+TF_SKIP_REFRESH: bool = False
+# Matches the top-level "resources" array of a state file and captures its first non-blank byte.
+STATE_RESOURCES_RE = re.compile(rb'"resources"\s*:\s*\[\s*(\S)')
+EXCEL_ENGINE: str = 'calamine'
+
+# --- VALIDATION PATTERNS ---
+# Compiled once at import time and shared by the schema rules and the domain-list checks.
+HOSTNAME_RE = re.compile(r'^(([a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9\-]*[a-zA-Z0-9])\.)*([A-Za-z0-9]|[A-Za-z0-9][A-Za-z0-9\-]*[A-Za-z0-9])$')
+IP_CIDR_RE = re.compile(r'^([0-9]{1,3}\.){3}[0-9]{1,3}(\/([0-9]|[1-2][0-9]|3[0-2]))?$')
 
 # --- VALIDATION SCHEMA ---
 # Defines the validation rules for the LoadBalancers sheet.
@@ -58,240 +95,523 @@ VALIDATION_SCHEMA: Dict[str, Dict] = {
 
     # --- Regex Rules for IP Addresses ---
     'ip_address_private': {
-        'regex': r'^([0-9]{1,3}\.){3}[0-9]{1,3}(\/([0-9]|[1-2][0-9]|3[0-2]))?$',
+        'regex': IP_CIDR_RE,
         'depends_on': {'column': 'origin_server_type', 'value': 'private_ip'}
     },
     'ip_address_public': {
-        'regex': r'^([0-9]{1,3}\.){3}[0-9]{1,3}(\/([0-9]|[1-2][0-9]|3[0-2]))?$',
+        'regex': IP_CIDR_RE,
         'depends_on': {'column': 'origin_server_type', 'value': 'public_ip'}
     },
     # --- Regex Rules for Hostnames ---
     'dns_name_private': {
-        'regex': r'^(([a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9\-]*[a-zA-Z0-9])\.)*([A-Za-z0-9]|[A-Za-z0-9][A-Za-z0-9\-]*[A-Za-z0-9])$'
+        'regex': HOSTNAME_RE
     },
     'dns_name_public': {
-        'regex': r'^(([a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9\-]*[a-zA-Z0-9])\.)*([A-Za-z0-9]|[A-Za-z0-9][A-Za-z0-9\-]*[A-Za-z0-9])$'
+        'regex': HOSTNAME_RE
     },
 }
+# Columns the 'LoadBalancers' sheet must have; see validate_dataframe().
+SCHEMA_COLUMNS: FrozenSet[str] = frozenset(VALIDATION_SCHEMA)
 
 # ==============================================================================
 # --- DATA & COMMAND FUNCTIONS ---
 # ==============================================================================
 
-def run_command(command: List[str], working_dir: str = '.') -> Tuple[int, List[str]]:
-    """Runs a command, streams output, and returns the result."""
-    print(f"\n🚀 Running: {' '.join(command)}")
+# Last parsed workbook as ((mtime_ns, size), df_lb, provider_config, lb_rows); see load_data().
+_excel_cache: Optional[Tuple[Tuple[int, int], pd.DataFrame, pd.Series, List[Any]]] = None
+# Last 'terraform workspace list' result as (monotonic timestamp, names); see get_existing_workspaces().
+_ws_cache: Optional[Tuple[float, Set[str]]] = None
+# Per state file: ((mtime_ns, size), has resources); see state_has_resources().
+_state_cache: Dict[str, Tuple[Tuple[int, int], bool]] = {}
+
+def console_fd() -> Optional[int]:
+    """
+    Flushes sys.stdout and returns its file descriptor, so command output can be echoed with
+    os.write() and skip Python's text layer. Returns None if stdout is not backed by a real file.
+    """
     try:
-        process = subprocess.Popen(command, cwd=working_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
-        output_lines = []
-        for line in iter(process.stdout.readline, ''): print(line.strip()); output_lines.append(line.strip())
-        process.wait()
+        sys.stdout.flush()
+        return sys.stdout.fileno()
+    except (AttributeError, ValueError):
+        return None
+
+def run_command(command: List[str], working_dir: str = '.', env: Optional[Dict[str, str]] = None,
+                quiet: bool = False) -> Tuple[int, List[str]]:
+    """Runs a command, streams output (or only captures it when quiet), and returns the result."""
+    if not quiet: print(f"\n🚀 Running: {' '.join(command)}")
+    try:
+        # Quiet runs have nobody watching their output, so they must never wait on terminal input.
+        process = subprocess.Popen(command, cwd=working_dir, env=env, stdin=subprocess.DEVNULL if quiet else None,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=0)
+        if quiet:
+            # Nothing is echoed, so let communicate() collect the whole output in one go.
+            output = process.communicate()[0]
+        else:
+            # Read whatever is available in large blocks instead of one readline() per line and
+            # echo the raw bytes; the output is only decoded and split into lines at the end.
+            chunks = []
+            stdout_fd = console_fd()
+            decoder = None if stdout_fd is not None else codecs.getincrementaldecoder('utf-8')(errors='replace')
+            while True:
+                data = os.read(process.stdout.fileno(), READ_CHUNK_SIZE)
+                if not data: break
+                if decoder is None:
+                    view = memoryview(data)
+                    while view: view = view[os.write(stdout_fd, view):]
+                else:
+                    sys.stdout.write(decoder.decode(data)); sys.stdout.flush()
+                chunks.append(data)
+            process.stdout.close()
+            process.wait()
+            output = b''.join(chunks)
+        output_lines = [line.strip() for line in output.decode('utf-8', errors='replace').splitlines()]
         rc = process.returncode
-        print("✅ Command finished successfully." if rc == 0 else f"❌ Command failed with exit code {rc}")
+        if rc == 0 and command[:2] == ['terraform', 'workspace'] and (command[2:3] in (['new'], ['delete']) or '-or-create=true' in command):
+            invalidate_workspaces()
+        if not quiet: print("✅ Command finished successfully." if rc == 0 else f"❌ Command failed with exit code {rc}")
         return rc, output_lines
     except Exception as e:
         print(f"❌ An error occurred: {e}")
         return -1, []
 
+def invalidate_workspaces():
+    """Drops the cached workspace list so the next lookup re-queries Terraform."""
+    global _ws_cache
+    _ws_cache = None
+
+def uses_local_backend() -> bool:
+    """
+    Returns True if Terraform keeps workspace state under STATE_DIR, i.e. no backend is
+    configured or the 'local' backend is used without a custom workspace_dir.
+    """
+    try:
+        with open(os.path.join('.terraform', 'terraform.tfstate'), 'rb') as f:
+            backend = json_loads(f.read()).get('backend') or {}
+    except FileNotFoundError:
+        return True
+    except (OSError, ValueError):
+        return False
+    return backend.get('type', 'local') == 'local' and not (backend.get('config') or {}).get('workspace_dir')
+
 def get_existing_workspaces(quiet: bool = False) -> Optional[Set[str]]:
-    """Runs 'terraform workspace list' and returns a clean set of workspace names."""
+    """
+    Returns a clean set of workspace names. With the local backend the workspace directories
+    are listed directly, which is cheap enough to do every time; otherwise the result of
+    'terraform workspace list' is reused for WORKSPACE_CACHE_TTL seconds unless a workspace
+    is created or deleted in the meantime.
+    """
+    global _ws_cache
     if not quiet: print_header("Checking for existing workspaces")
+    if uses_local_backend():
+        try:
+            workspaces = {entry.name for entry in os.scandir(STATE_DIR) if entry.is_dir()} | {'default'}
+        except FileNotFoundError:
+            workspaces = {'default'}
+    elif _ws_cache is not None and time.monotonic() - _ws_cache[0] < WORKSPACE_CACHE_TTL:
+        workspaces = _ws_cache[1]
+    else:
+        try:
+            process = subprocess.run(['terraform', 'workspace', 'list'], capture_output=True, text=True, check=True)
+            output_lines = process.stdout.splitlines()
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            if not quiet: print(f"❌ Could not list Terraform workspaces. Error: {e}")
+            return None
+        # The selected workspace is listed as '* name', the others as '  name'.
+        workspaces = {line[2:].strip() if line.startswith('* ') else line.strip() for line in output_lines if line.strip()}
+        _ws_cache = (time.monotonic(), workspaces)
+    if not quiet: print("✅ Workspaces checked successfully.")
+    return set(workspaces)
+
+def excel_file_key() -> Optional[Tuple[int, int]]:
+    """Returns the Excel file's (mtime_ns, size), used to tell whether it was saved, or None if it is missing."""
     try:
-        process = subprocess.run(['terraform', 'workspace', 'list'], capture_output=True, text=True, check=True)
-        output_lines = process.stdout.splitlines()
-    except (subprocess.CalledProcessError, FileNotFoundError) as e:
-        if not quiet: print(f"❌ Could not list Terraform workspaces. Error: {e}")
+        stat = os.stat(EXCEL_FILE)
+    except OSError:
         return None
-    if not quiet: print("✅ Workspaces checked successfully.")
-    return {line.strip().replace('* ', '') for line in output_lines if line.strip()}
+    return stat.st_mtime_ns, stat.st_size
 
-def load_data() -> Optional[Tuple[pd.DataFrame, pd.Series]]:
-    """Loads and returns the latest data from the Excel file."""
+def load_data() -> Optional[Tuple[pd.DataFrame, pd.Series, List[Any]]]:
+    """
+    Loads and returns the latest data from the Excel file, along with the LoadBalancers
+    rows as namedtuples. The parsed result is reused until the file's modification time or size
+    changes; the size guards against saves that land within the filesystem's timestamp granularity.
+    """
+    global _excel_cache
     try:
-        df_lb = pd.read_excel(EXCEL_FILE, sheet_name='LoadBalancers')
-        df_provider = pd.read_excel(EXCEL_FILE, sheet_name='Provider')
-        return df_lb, df_provider.iloc[0]
+        stat = os.stat(EXCEL_FILE)
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        if _excel_cache is not None and _excel_cache[0] == file_key:
+            return _excel_cache[1], _excel_cache[2], _excel_cache[3]
+        # pandas' openpyxl reader already opens the workbook read-only; calamine is just faster.
+        with pd.ExcelFile(EXCEL_FILE, engine=EXCEL_ENGINE if HAS_CALAMINE else 'openpyxl') as xls:
+            df_lb = xls.parse('LoadBalancers', usecols=lambda c: c in LB_COLUMNS, dtype=LB_DTYPES)
+            df_provider = xls.parse('Provider')
+        lb_rows = list(df_lb.itertuples(index=False))
+        _excel_cache = (file_key, df_lb, df_provider.iloc[0], lb_rows)
+        return df_lb, df_provider.iloc[0], lb_rows
     except Exception as e:
         print(f"❌ Error loading Excel file '{EXCEL_FILE}': {e}")
-        return None, None
+        return None, None, None
+
+def read_export_entry(path: str, arcname: str) -> Optional[Tuple[Any, bytes]]:
+    """
+    Returns (zipfile.ZipInfo, contents) for a file to export, or None if it does not exist.
+    The ZipInfo carries the file's own mtime and mode, as ZipFile.write() would record them.
+    """
+    import zipfile
+    try:
+        zinfo = zipfile.ZipInfo.from_file(path, arcname)
+        with open(path, 'rb') as f:
+            return zinfo, f.read()
+    except FileNotFoundError:
+        return None
+
+def state_has_resources(state_file_path: str) -> bool:
+    """
+    Returns True if the given Terraform state file records at least one resource.
+    The answer is cached per file and only recomputed when the file's mtime or size changes.
+    """
+    try:
+        stat = os.stat(state_file_path)
+    except OSError:
+        return False
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _state_cache.get(state_file_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    result = stat.st_size > 0 and read_state_has_resources(state_file_path)
+    _state_cache[state_file_path] = (signature, result)
+    return result
+
+def read_state_has_resources(state_file_path: str) -> bool:
+    """
+    Reads a state file and checks it for resources. When the "resources" key occurs exactly
+    once, the answer is read straight from the raw bytes; any other layout falls back to a
+    full JSON decode.
+    """
+    try:
+        with open(state_file_path, 'rb') as f:
+            data = f.read()
+        if not data: return False
+        if data.count(b'"resources"') == 1:
+            match = STATE_RESOURCES_RE.search(data)
+            if match: return match.group(1) != b']'
+        return bool(json_loads(data).get('resources'))
+    except (OSError, ValueError, AttributeError):
+        return False
 
 def is_deployed(lb_name: str) -> bool:
     """
     Checks if a deployment is truly complete by verifying its state file.
     """
-    state_file_path = os.path.join('terraform.tfstate.d', lb_name, 'terraform.tfstate')
-    return os.path.exists(state_file_path) and os.path.getsize(state_file_path) > 100
+    return state_has_resources(os.path.join(STATE_DIR, lb_name, 'terraform.tfstate'))
+
+def scan_deployed_set() -> Set[str]:
+    """
+    Returns the names of all workspaces whose state file holds at least one resource,
+    using a single scan of the state directory.
+    """
+    deployed = set()
+    try:
+        entries = list(os.scandir(STATE_DIR))
+    except FileNotFoundError:
+        return deployed
+    for entry in entries:
+        if entry.is_dir() and state_has_resources(os.path.join(entry.path, 'terraform.tfstate')):
+            deployed.add(entry.name)
+    return deployed
+
+def column_or_none(df: pd.DataFrame, column: str) -> pd.Series:
+    """Returns df[column], or an all-None Series if the column is absent (the column-wise row.get())."""
+    return df[column] if column in df.columns else pd.Series([None] * len(df), index=df.index, dtype=object)
+
+def is_true(values: pd.Series) -> pd.Series:
+    """Column-wise `value is True`: only real booleans count, not 1 or the string 'TRUE'."""
+    if pd.api.types.is_bool_dtype(values):
+        return values.fillna(False).astype(bool)
+    return values.map(lambda v: v is True).astype(bool)
+
+def truthy(values: pd.Series) -> pd.Series:
+    """Column-wise `bool(value)`, exactly as an `if value:` test on each cell would see it."""
+    return pd.Series([bool(v) for v in values.to_numpy(dtype=object)], index=values.index, dtype=bool)
+
+def equals(values: pd.Series, target: Any) -> pd.Series:
+    """Column-wise `value == target`, with missing or incomparable cells counting as False."""
+    return (values == target).fillna(False).astype(bool)
+
+def matches(values: pd.Series, pattern: re.Pattern) -> pd.Series:
+    """Column-wise `pattern.match(str(value))` for the present cells; missing cells count as False."""
+    present = values[values.notna()]
+    return present.astype(str).str.match(pattern).astype(bool).reindex(values.index, fill_value=False)
+
+def invalid_hostname_lists(values: pd.Series) -> pd.Series:
+    """
+    Checks comma-separated hostname lists column-wise. Returns, per row with at least one
+    invalid entry, those entries joined by ', ' (rows without any are left out).
+    """
+    entries = values.astype(str).str.split(',').explode().str.strip()
+    invalid = entries[~entries.str.match(HOSTNAME_RE).astype(bool)]
+    return invalid.groupby(level=0, sort=False).agg(', '.join)
 
-def validate_dataframe(df: pd.DataFrame) -> List[str]:
+def validate_dataframe(df: pd.DataFrame, row_indices: Optional[Iterable[int]] = None) -> List[str]:
     """
     Validates the DataFrame against the global VALIDATION_SCHEMA and custom logic.
+    Every rule is evaluated as a boolean mask over whole columns; error messages are only
+    built for the offending rows and reported row by row, in rule order.
+    If `row_indices` is given, only those rows (index labels of `df`) are validated.
     """
     errors = []
+    if row_indices is not None:
+        df = df.loc[list(row_indices)]
     
-    schema_columns = set(VALIDATION_SCHEMA.keys())
-    excel_columns = set(df.columns)
-    missing_columns = schema_columns - excel_columns
+    missing_columns = SCHEMA_COLUMNS.difference(df.columns)
     
     if missing_columns:
         errors.append(f"The following expected columns are missing in 'LoadBalancers' sheet (check for typos): {', '.join(sorted(list(missing_columns)))}")
         return errors
 
-    hostname_regex = r'^(([a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9\-]*[a-zA-Z0-9])\.)*([A-Za-z0-9]|[A-Za-z0-9][A-Za-z0-9\-]*[A-Za-z0-9])$'
+    lb_names = df['lb_name'].to_numpy(dtype=object)
+    found: List[Tuple[int, str]] = []  # (row position, message), in rule order
+
+    def flag(mask: pd.Series, message: Any):
+        """Records `message` (a string, or a per-row Series of strings) for every row in `mask`."""
+        for pos in np.flatnonzero(mask.to_numpy(dtype=bool)):
+            text = message if isinstance(message, str) else message.iloc[pos]
+            found.append((pos, f"Row {df.index[pos] + 2} ('{lb_names[pos]}'): {text}"))
+
+    for column, rules in VALIDATION_SCHEMA.items():
+        values = df[column]
+        missing = values.isna()
+        checked = ~missing
+        if rules.get('required'):
+            flag(missing, f"Required field '{column}' is empty.")
+        if 'depends_on' in rules:
+            dependency = rules['depends_on']
+            trigger_column = dependency['column']
+            trigger_value = dependency['value']
+            triggered = equals(column_or_none(df, trigger_column), trigger_value)
+            if rules.get('required'): triggered &= ~missing
+            if dependency.get('required'):
+                flag(triggered & missing, f"'{column}' is required because '{trigger_column}' is '{trigger_value}'.")
+            checked &= triggered
+        if 'allowed_values' in rules:
+            flag(checked & ~values.isin(rules['allowed_values']), f"Invalid value for '{column}'. Allowed: {rules['allowed_values']}.")
+        if 'regex' in rules:
+            flag(checked & ~matches(values, rules['regex']), f"Invalid format for '{column}'.")
+
+    for column, applies in (('domains', None), ('csrf_custom_domains', 'enable_csrf')):
+        values = column_or_none(df, column)
+        checked = values.notna()
+        if applies: checked &= truthy(column_or_none(df, applies))
+        invalid = invalid_hostname_lists(values[checked])
+        if invalid.empty: continue
+        messages = (f"The '{column}' field contains invalid hostnames: " + invalid + ".").reindex(df.index)
+        flag(messages.notna(), messages)
+
+    advertise_custom = is_true(column_or_none(df, 'advertise_custom'))
+    flag(is_true(column_or_none(df, 'advertise_on_public_default_vip')) & advertise_custom,
+         "Both 'advertise_on_public_default_vip' and 'advertise_custom' cannot be TRUE at the same time.")
+
+    needs_site = is_true(column_or_none(df, 'create_origin_pool')) & \
+        column_or_none(df, 'origin_server_type').isin(['private_ip', 'private_name', 'k8s_service'])
+    site_locator_type = column_or_none(df, 'site_locator_type')
+    flag(needs_site & site_locator_type.isna(), "'site_locator_type' is required for this origin server type.")
+    flag(needs_site & site_locator_type.notna() & ~site_locator_type.isin(['site', 'virtual_site']),
+         "Invalid value for 'site_locator_type'. Must be 'site' or 'virtual_site'.")
+    flag(needs_site & column_or_none(df, 'vsite_or_site_name').isna(), "'vsite_or_site_name' is required for this origin server type.")
+
+    # --- Custom validation for advertisement settings ---
+    advertise_where = column_or_none(df, 'advertise_where')
+    flag(advertise_custom & advertise_where.isna(), "'advertise_where' is required because 'advertise_custom' is TRUE.")
+    flag(advertise_custom & advertise_where.notna() & ~advertise_where.isin(['site', 'virtual_site']),
+         "Invalid value for 'advertise_where'. Must be 'site' or 'virtual_site'.")
+    flag(advertise_custom & equals(advertise_where, 'virtual_site') & column_or_none(df, 'vsite_namespace').isna(),
+         "'vsite_namespace' is required because 'advertise_where' is 'virtual_site'.")
+
+    # A stable sort on the row position keeps each row's errors in rule order.
+    errors.extend(message for _, message in sorted(found, key=lambda item: item[0]))
+    return errors
 
-    for index, row in df.iterrows():
-        for column, rules in VALIDATION_SCHEMA.items():
-            cell_value = row.get(column)
-            
-            if rules.get('required') and pd.isna(cell_value):
-                errors.append(f"Row {index + 2} ('{row['lb_name']}'): Required field '{column}' is empty.")
-                continue
-
-            if 'depends_on' in rules:
-                dependency = rules['depends_on']
-                trigger_column = dependency['column']
-                trigger_value = dependency['value']
-                
-                if row.get(trigger_column) == trigger_value:
-                    if dependency.get('required') and pd.isna(cell_value):
-                        errors.append(f"Row {index + 2} ('{row['lb_name']}'): '{column}' is required because '{trigger_column}' is '{trigger_value}'.")
-                        continue
-                    if pd.notna(cell_value):
-                        if 'allowed_values' in rules and cell_value not in rules['allowed_values']:
-                            errors.append(f"Row {index + 2} ('{row['lb_name']}'): Invalid value for '{column}'. Allowed: {rules['allowed_values']}.")
-                        if 'regex' in rules and not re.match(rules['regex'], str(cell_value)):
-                            errors.append(f"Row {index + 2} ('{row['lb_name']}'): Invalid format for '{column}'.")
-
-            elif pd.notna(cell_value):
-                if 'allowed_values' in rules and cell_value not in rules['allowed_values']:
-                    errors.append(f"Row {index + 2} ('{row['lb_name']}'): Invalid value for '{column}'. Allowed: {rules['allowed_values']}.")
-                if 'regex' in rules and not re.match(rules['regex'], str(cell_value)):
-                     errors.append(f"Row {index + 2} ('{row['lb_name']}'): Invalid format for '{column}'.")
-
-        if pd.notna(row.get('domains')):
-            invalid_domains = [d.strip() for d in str(row['domains']).split(',') if not re.match(hostname_regex, d.strip())]
-            if invalid_domains:
-                errors.append(f"Row {index + 2} ('{row['lb_name']}'): The 'domains' field contains invalid hostnames: {', '.join(invalid_domains)}.")
-        
-        if row.get('enable_csrf') and pd.notna(row.get('csrf_custom_domains')):
-            invalid_csrf_domains = [d.strip() for d in str(row['csrf_custom_domains']).split(',') if not re.match(hostname_regex, d.strip())]
-            if invalid_csrf_domains:
-                errors.append(f"Row {index + 2} ('{row['lb_name']}'): The 'csrf_custom_domains' field contains invalid hostnames: {', '.join(invalid_csrf_domains)}.")
-        
-        if row.get('advertise_on_public_default_vip') is True and row.get('advertise_custom') is True:
-            errors.append(f"Row {index + 2} ('{row['lb_name']}'): Both 'advertise_on_public_default_vip' and 'advertise_custom' cannot be TRUE at the same time.")
-            
-        if row.get('create_origin_pool') is True and row.get('origin_server_type') in ['private_ip', 'private_name', 'k8s_service']:
-            if pd.isna(row.get('site_locator_type')):
-                errors.append(f"Row {index + 2} ('{row['lb_name']}'): 'site_locator_type' is required for this origin server type.")
-            elif row.get('site_locator_type') not in ['site', 'virtual_site']:
-                errors.append(f"Row {index + 2} ('{row['lb_name']}'): Invalid value for 'site_locator_type'. Must be 'site' or 'virtual_site'.")
-            if pd.isna(row.get('vsite_or_site_name')):
-                errors.append(f"Row {index + 2} ('{row['lb_name']}'): 'vsite_or_site_name' is required for this origin server type.")
-
-        # --- NEW: Custom validation for advertisement settings ---
-        if row.get('advertise_custom') is True:
-            if pd.isna(row.get('advertise_where')):
-                errors.append(f"Row {index + 2} ('{row['lb_name']}'): 'advertise_where' is required because 'advertise_custom' is TRUE.")
-            elif row.get('advertise_where') not in ['site', 'virtual_site']:
-                 errors.append(f"Row {index + 2} ('{row['lb_name']}'): Invalid value for 'advertise_where'. Must be 'site' or 'virtual_site'.")
-            
-            if row.get('advertise_where') == 'virtual_site' and pd.isna(row.get('vsite_namespace')):
-                errors.append(f"Row {index + 2} ('{row['lb_name']}'): 'vsite_namespace' is required because 'advertise_where' is 'virtual_site'.")
 
-    return errors
+def is_present(value: Any) -> bool:
+    """Cheap scalar pd.notna() for loaded cell values, where a blank cell is None or a float NaN."""
+    return value is not None and not (isinstance(value, float) and value != value)
+
+def format_string(value): return f'"{str(value)}"' if pd.notna(value) and value != '' else '""'
+def format_boolean(value): return str(bool(value)).lower()
+def format_list(value):
+    items = [f'"{item.strip()}"' for item in str(value).split(',')] if pd.notna(value) and value != '' else []
+    return f'[{", ".join(items)}]'
+def format_map(value):
+    items = str(value).split(',') if pd.notna(value) and value != '' else []
+    map_entries = [f'"{k.strip()}" = "{v.strip()}"' for k, v in (item.split('=', 1) for item in items if '=' in item)]
+    return f'{{{", ".join(map_entries)}}}' if map_entries else '{}'
+def format_number(value): return str(int(value)) if pd.notna(value) and value is not None else 'null'
+
+# --- TFVARS ATTRIBUTE TABLES ---
+# Maps each Excel column written to a .tfvars file to the formatter that renders its HCL literal.
+ORIGIN_POOL_VARS: Dict[str, Callable[[Any], str]] = {
+    "origin_pool_name": format_string, "origin_server_type": format_string,
+    "origin_port": format_number, "origin_labels": format_map,
+    "network_type": format_string, "site_locator_type": format_string,
+    "vsite_or_site_name": format_string, "enable_tls": format_boolean,
+    "dns_name_private": format_string, "k8s_service_name": format_string,
+    "ip_address_private": format_string, "ip_address_public": format_string,
+    "dns_name_public": format_string
+}
+HEALTHCHECK_VARS: Dict[str, Callable[[Any], str]] = {
+    "healthcheck_name": format_string, "healthcheck_type": format_string,
+    "healthcheck_http_path": format_string
+}
+LB_OBJECT_ATTRS: Dict[str, Callable[[Any], str]] = {
+    "lb_name": format_string, "domains": format_list,
+    "lb_labels": format_map, "ip_threat_categories": format_list,
+    "create_origin_pool": format_boolean, "existing_origin_pool_name": format_string,
+    "enable_bot_defense": format_boolean, "advertise_on_public_default_vip": format_boolean,
+    "advertise_custom": format_boolean, "advertise_site_name": format_string,
+    "site_network": format_string, "advertise_where": format_string,
+    "vsite_namespace": format_string, "app_firewall_name": format_string,
+    "enable_app_firewall": format_boolean, "enable_csrf": format_boolean,
+    "create_new_waf": format_boolean,
+    "csrf_policy_mode": format_string, "csrf_custom_domains": format_string,
+    "lb_type": format_string, "lb_port": format_number,
+    "add_hsts": format_boolean, "http_redirect": format_boolean,
+    "custom_cert_names": format_string, "custom_cert_namespace": format_string,
+    "enable_healthcheck": format_boolean
+}
+WAF_VARS: Dict[str, Callable[[Any], str]] = {"waf_namespace": format_string}
+TFVARS_FORMATTERS: Dict[str, Callable[[Any], str]] = {
+    "namespace": format_string, **WAF_VARS, **ORIGIN_POOL_VARS, **HEALTHCHECK_VARS, **LB_OBJECT_ATTRS
+}
 
+# --- LOADBALANCERS SHEET COLUMNS ---
+# Known sheet columns that are neither validated nor written to .tfvars but are still shown by
+# 'View Configuration' (e.g. attach_healthcheck, an input of the root module's variables.tf).
+DISPLAY_ONLY_COLUMNS: FrozenSet[str] = frozenset({'attach_healthcheck'})
+# Every column the orchestrator reads (validated, written to .tfvars or displayed); anything else in
+# the sheet is skipped at parse time. Derived from the tables above so a new attribute is never silently dropped.
+LB_COLUMNS: FrozenSet[str] = SCHEMA_COLUMNS | frozenset(TFVARS_FORMATTERS) | DISPLAY_ONLY_COLUMNS
+# Text columns (everything written as a string, list or map) are read as str so pandas can skip type
+# inference for them. Boolean and numeric columns keep the parser's native types on purpose: a stray
+# 'yes' or 'eighty' there must reach validate_dataframe as a readable error, not fail the whole load.
+LB_DTYPES: Dict[str, Any] = {column: str for column, formatter in TFVARS_FORMATTERS.items()
+                             if formatter in (format_string, format_list, format_map)}
+
+# --- TFVARS SECTIONS ---
+def assignment_items(variables: Dict[str, Callable[[Any], str]], width: int,
+                     indent: str = '') -> List[Tuple[str, str, Callable[[Any], str]]]:
+    """
+    Returns (name, prefix, formatter) triples, where prefix is the indented `name = ` text padded
+    to `width` so the '=' signs line up. Built once here instead of for every generated file.
+    """
+    return [(name, f"{indent}{name.ljust(width)} = ", formatter) for name, formatter in variables.items()]
+
+# Optional top-level sections of a .tfvars file, emitted in order when their guard holds for the row.
+# 'emit_absent' also writes blank cells (as "").
+TFVARS_SECTIONS: List[Dict[str, Any]] = [
+    {'title': "App Firewall (WAF) Variables", 'guard': lambda row: getattr(row, 'create_new_waf', False),
+     'items': assignment_items(WAF_VARS, 13), 'emit_absent': True},
+    {'title': "Origin Pool Variables (Top-Level)", 'guard': lambda row: getattr(row, 'create_origin_pool', False),
+     'items': assignment_items(ORIGIN_POOL_VARS, 25)},
+    {'title': "Health Check Variables (Top-Level)",
+     'guard': lambda row: getattr(row, 'create_origin_pool', False) and getattr(row, 'enable_healthcheck', False),
+     'items': assignment_items(HEALTHCHECK_VARS, 21)},
+]
+# Attributes of the single entry in the `load_balancers` list, which is always written.
+LB_OBJECT_SECTION: Dict[str, Any] = {'items': assignment_items(LB_OBJECT_ATTRS, 31, indent='    ')}
+# Suffix of the columns added by preformat_tfvars(), e.g. 'lb_port__hcl'.
+FORMATTED_SUFFIX: str = '__hcl'
+
+def format_series(values: pd.Series, formatter: Callable[[Any], str]) -> pd.Series:
+    """
+    Column-wise equivalent of applying `formatter` to every present value of `values`.
+    Absent (NaN) cells are left empty.
+    """
+    present = values[values.notna()]
+    result = pd.Series(None, index=values.index, dtype=object)
+    if present.empty:
+        return result
+    if formatter is format_boolean:
+        formatted = pd.Series(np.where(present.astype(bool), 'true', 'false'), index=present.index)
+    elif formatter is format_number:
+        formatted = present.astype(float).astype('int64').astype(str)
+    elif formatter is format_string:
+        formatted = '"' + present.astype(str) + '"'
+    else:
+        text = present.astype(str)
+        parts = text[text != ''].str.split(',').explode()
+        if formatter is format_list:
+            entries = '"' + parts.str.strip() + '"'
+            empty, prefix, suffix = '[]', '[', ']'
+        else:
+            pairs = parts[parts.str.contains('=', regex=False)].str.split('=', n=1)
+            entries = '"' + pairs.str[0].str.strip() + '" = "' + pairs.str[1].str.strip() + '"'
+            empty, prefix, suffix = '{}', '{', '}'
+        joined = entries.groupby(level=0).agg(', '.join) if not entries.empty else entries
+        formatted = (prefix + joined + suffix).reindex(present.index, fill_value=empty)
+    result[present.index] = formatted
+    return result
+
+def preformat_tfvars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Renders every .tfvars column of `df` in one column-wise pass and returns a copy of `df`
+    with the results added as '<column>__hcl' columns, which generate_tfvars_content() reuses.
+    """
+    formatted = {f"{col}{FORMATTED_SUFFIX}": format_series(df[col], formatter)
+                 for col, formatter in TFVARS_FORMATTERS.items() if col in df.columns}
+    return df.assign(**formatted)
+
+def formatted_value(row: Any, attr: str, formatter: Callable[[Any], str]) -> str:
+    """Returns the HCL literal for `row.attr`, preferring the value precomputed by preformat_tfvars()."""
+    precomputed = getattr(row, f"{attr}{FORMATTED_SUFFIX}", None)
+    return precomputed if isinstance(precomputed, str) else formatter(getattr(row, attr, None))
+
+def section_banner(title: str) -> str:
+    """Returns the comment banner (with trailing newline) that opens a section of a .tfvars file."""
+    return f"####################################################\n# {title}\n####################################################\n"
+
+def render_assignments(row: Any, section: Dict[str, Any]) -> List[str]:
+    """Renders the `name = value` lines of one TFVARS_SECTIONS entry (or the LB object) for a row."""
+    emit_absent = section.get('emit_absent', False)
+    return [prefix + formatted_value(row, var_name, formatter) for var_name, prefix, formatter in section['items']
+            if emit_absent or is_present(getattr(row, var_name, None))]
 
 def generate_tfvars_content(row: Any, provider_config: pd.Series) -> str:
-    # (This function is unchanged from the previous working version)
-    def format_string(value): return f'"{str(value)}"' if pd.notna(value) and value != '' else '""'
-    def format_boolean(value): return str(bool(value)).lower()
-    def format_list(value): 
-        items = [f'"{item.strip()}"' for item in str(value).split(',')] if pd.notna(value) and value != '' else []
-        return f'[{", ".join(items)}]'
-    def format_map(value):
-        items = str(value).split(',') if pd.notna(value) and value != '' else []
-        map_entries = [f'"{k.strip()}" = "{v.strip()}"' for k, v in (item.split('=', 1) for item in items if '=' in item)]
-        return f'{{{", ".join(map_entries)}}}' if map_entries else '{}'
-    def format_number(value): return str(int(value)) if pd.notna(value) and value is not None else 'null'
-    
-    content = [
-        "####################################################",
-        "# Global & Provider Variables",
-        "####################################################",
-        f'api_p12_file = {format_string(provider_config.get("api_p12_file"))}',
-        f'tenant_name  = {format_string(provider_config.get("tenant_name"))}',
-        f'api_url      = {format_string(provider_config.get("api_url"))}',
-        f'namespace    = {format_string(getattr(row, "namespace", None))}',
-        ""
-    ]
-
-    if getattr(row, 'create_new_waf', False):
-        content.append("####################################################")
-        content.append("# App Firewall (WAF) Variables")
-        content.append("####################################################")
-        content.append(f'waf_namespace = {format_string(getattr(row, "waf_namespace", None))}')
-        content.append("")
-    if getattr(row, 'create_origin_pool', False):
-        content.append("####################################################")
-        content.append("# Origin Pool Variables (Top-Level)")
-        content.append("####################################################")
-        top_level_origin_vars = {
-            "origin_pool_name": format_string, "origin_server_type": format_string,
-            "origin_port": format_number, "origin_labels": format_map,
-            "network_type": format_string, "site_locator_type": format_string, 
-            "vsite_or_site_name": format_string, "enable_tls": format_boolean,
-            "dns_name_private": format_string, "k8s_service_name": format_string,
-            "ip_address_private": format_string, "ip_address_public": format_string,
-            "dns_name_public": format_string
-        }
-        for var_name, formatter in top_level_origin_vars.items():
-            if pd.notna(getattr(row, var_name, None)):
-                content.append(f'{var_name.ljust(25)} = {formatter(getattr(row, var_name))}')
-        content.append("")
-    if getattr(row, 'create_origin_pool', False) and getattr(row, 'enable_healthcheck', False):
-        content.append("####################################################")
-        content.append("# Health Check Variables (Top-Level)")
-        content.append("####################################################")
-        if pd.notna(getattr(row, 'healthcheck_name', None)):
-            content.append(f'healthcheck_name      = {format_string(getattr(row, "healthcheck_name"))}')
-        if pd.notna(getattr(row, 'healthcheck_type', None)):
-            content.append(f'healthcheck_type      = {format_string(getattr(row, "healthcheck_type"))}')
-        if pd.notna(getattr(row, 'healthcheck_http_path', None)):
-            content.append(f'healthcheck_http_path = {format_string(getattr(row, "healthcheck_http_path"))}')
-        content.append("")
-    object_lines = []
-    lb_object_attrs = {
-        "lb_name": format_string, "domains": format_list,
-        "lb_labels": format_map, "ip_threat_categories": format_list,
-        "create_origin_pool": format_boolean, "existing_origin_pool_name": format_string,
-        "enable_bot_defense": format_boolean, "advertise_on_public_default_vip": format_boolean,
-        "advertise_custom": format_boolean, "advertise_site_name": format_string,
-        "site_network": format_string, "advertise_where": format_string,
-        "vsite_namespace": format_string, "app_firewall_name": format_string,
-        "app_firewall_name": format_string,
-        "enable_app_firewall": format_boolean, "enable_csrf": format_boolean,
-        "create_new_waf": format_boolean,
-        "csrf_policy_mode": format_string, "csrf_custom_domains": format_string, 
-        "lb_type": format_string, "lb_port": format_number, 
-        "add_hsts": format_boolean, "http_redirect": format_boolean, 
-        "custom_cert_names": format_string, "custom_cert_namespace": format_string, 
-        "enable_healthcheck": format_boolean
-    }
-    for attr, formatter in lb_object_attrs.items():
-        value = getattr(row, attr, None)
-        if pd.notna(value):
-             object_lines.append(f'    {attr.ljust(31)} = {formatter(value)}')
-    content.extend([
-        "\n####################################################",
-        "# Load Balancer Object",
-        "####################################################",
-        "load_balancers = [",
-        "  {",
-        ",\n".join(object_lines),
-        "  }",
-        "]"
-    ])
-    return "\n".join(content)
+    """Returns the full .tfvars content for one LB row as a string (see write_tfvars())."""
+    buf = io.StringIO()
+    write_tfvars(row, provider_config, buf)
+    return buf.getvalue()
+
+def write_tfvars(row: Any, provider_config: pd.Series, buf: TextIO):
+    """Writes the .tfvars content for one LB row, piece by piece, to a text file object."""
+    buf.write(section_banner("Global & Provider Variables"))
+    buf.write(f'api_p12_file = {format_string(provider_config.get("api_p12_file"))}\n')
+    buf.write(f'tenant_name  = {format_string(provider_config.get("tenant_name"))}\n')
+    buf.write(f'api_url      = {format_string(provider_config.get("api_url"))}\n')
+    buf.write(f'namespace    = {formatted_value(row, "namespace", format_string)}\n\n')
+    for section in TFVARS_SECTIONS:
+        if not section['guard'](row): continue
+        buf.write(section_banner(section['title']))
+        buf.writelines(f"{line}\n" for line in render_assignments(row, section))
+        buf.write("\n")
+    buf.write("\n")
+    buf.write(section_banner("Load Balancer Object"))
+    buf.write("load_balancers = [\n  {\n")
+    buf.write(",\n".join(render_assignments(row, LB_OBJECT_SECTION)))
+    buf.write("\n  }\n]")
+
+def write_tfvars_file(tfvar_file: str, tfvars_content: str) -> bool:
+    """
+    Writes the .tfvars content to disk unless the file already holds exactly that content.
+    Returns True if the file was (re)written.
+    """
+    try:
+        with open(tfvar_file) as f:
+            if f.read() == tfvars_content: return False
+    except FileNotFoundError:
+        pass
+    with open(tfvar_file, 'w') as f: f.write(tfvars_content)
+    return True
 
 
 # ==============================================================================
@@ -335,25 +655,25 @@ def display_config(row: Any):
     print("\n## Load Balancer Details")
     lb_ignore_keys = origin_pool_keys | https_keys | healthcheck_keys | {'lb_name'}
     for key, value in row_dict.items():
-        if pd.notna(value) and key not in lb_ignore_keys: print(f"{key:<30}: {value}")
+        if is_present(value) and key not in lb_ignore_keys: print(f"{key:<30}: {value}")
     print("\n## HTTPS Configuration")
     for key in https_keys:
-        if key in row_dict and pd.notna(row_dict.get(key)):
+        if key in row_dict and is_present(row_dict.get(key)):
             value = row_dict.get(key)
             display_value = int(value) if key in port_columns else value
             print(f"{key:<30}: {display_value}")
     if row_dict.get('create_origin_pool'):
         print("\n## New Origin Pool Details")
         for key, value in row_dict.items():
-            if pd.notna(value) and key in origin_pool_keys:
+            if is_present(value) and key in origin_pool_keys:
                 display_value = int(value) if key in port_columns else value
                 print(f"{key:<30}: {display_value}")
         if row_dict.get('enable_healthcheck'):
             print("\n## Health Check Details")
             for key in healthcheck_keys:
-                if pd.notna(row_dict.get(key)):
+                if is_present(row_dict.get(key)):
                     print(f"{key:<30}: {row_dict.get(key)}")
-    elif pd.notna(row_dict.get('existing_origin_pool_name')):
+    elif is_present(row_dict.get('existing_origin_pool_name')):
          print(f"\n## Existing Origin Pool: {row_dict.get('existing_origin_pool_name')}")
 
 
@@ -361,39 +681,64 @@ def display_config(row: Any):
 # --- ORCHESTRATOR MENU HANDLERS ---
 # ==============================================================================
 
-def run_validation_loop() -> Optional[Tuple[pd.DataFrame, pd.Series]]:
+def run_validation_loop(row_label: Optional[int] = None, lb_name: Any = None) -> Optional[Tuple[pd.DataFrame, pd.Series, List[Any]]]:
     """
     Continuously validates the Excel file until it passes or the user cancels.
+    With `row_label` (an index label of the LoadBalancers sheet), the whole sheet is validated
+    once and any retries only re-validate that row. After every reload the row must still hold
+    `lb_name`; if rows were inserted or deleted in the meantime, the loop gives up.
     """
+    whole_sheet = True
     while True:
-        df_lb, provider_config = load_data()
+        file_key = excel_file_key()
+        df_lb, provider_config, lb_rows = load_data()
         if df_lb is None:
             input("Could not load Excel file. Please fix and press Enter to retry...")
             continue
-        errors = validate_dataframe(df_lb)
+        if row_label is not None and 'lb_name' in df_lb.columns:
+            moved = row_label not in df_lb.index
+            if not moved:
+                current_name = df_lb.at[row_label, 'lb_name']
+                moved = not (current_name == lb_name or (pd.isna(current_name) and pd.isna(lb_name)))
+            if moved:
+                print(f"❌ Row {row_label + 2} of the 'LoadBalancers' sheet no longer holds '{lb_name}'. "
+                      "The sheet changed since the LB was selected; please select it again.")
+                return None, None, None
+        errors = validate_dataframe(df_lb, None if row_label is None or whole_sheet else [row_label])
         if not errors:
-            print("✅ Excel configuration is valid.")
-            return df_lb, provider_config
+            print("✅ Excel configuration is valid." if whole_sheet else f"✅ Row {row_label + 2} of the Excel configuration is valid.")
+            return df_lb, provider_config, lb_rows
         print_header("Excel Validation Failed")
         for error in errors:
             print(f"  - {error}")
-        user_input = input("\nPlease fix the errors in config.xlsx, save the file, and press Enter to re-validate, or type 'M' to return to the menu: ").lower()
-        if user_input == 'm':
-            return None, None
-
-
-def handle_apply_single(df_lb: pd.DataFrame, provider_config: pd.Series):
+        if whole_sheet and row_label is not None:
+            print(f"\nOnly row {row_label + 2} ('{lb_name}') will be re-validated once you save; other rows do not affect this apply.")
+        whole_sheet = row_label is None
+        prompt = "\nPlease fix the errors in config.xlsx, save the file, and press Enter to re-validate, or type 'M' to return to the menu: "
+        # Only reload once the file has actually been saved again.
+        while True:
+            if input(prompt).lower() == 'm':
+                return None, None, None
+            if excel_file_key() != file_key: break
+            prompt = "No changes detected, press Enter to re-check once you save (or type 'M' to return to the menu): "
+
+
+def handle_apply_single(df_lb: pd.DataFrame, provider_config: pd.Series, lb_rows: List[Any]):
     """Handles the Apply (Deploy or Modify) action for a single LB."""
     print_header("Apply a Single Deployment (Deploy or Modify)")
     
-    validated_data = run_validation_loop()
-    if validated_data[0] is None: return
-    df_lb_validated, provider_config_validated = validated_data
-
-    lb_rows = list(df_lb_validated.itertuples(index=False))
     lb_row_to_apply = prompt_for_selection(lb_rows, "Select an LB to apply:", "lb_name")
     if lb_row_to_apply is None: return
 
+    # Only the selected LB ends up in its .tfvars file, so after a first whole-sheet check only
+    # its row is re-validated. The row is tracked by its index label (blank or duplicate lb_names
+    # are possible), and run_validation_loop() checks it still holds the selected LB.
+    row_label = df_lb.index[next(i for i, row in enumerate(lb_rows) if row is lb_row_to_apply)]
+    validated_data = run_validation_loop(row_label, getattr(lb_row_to_apply, 'lb_name', None))
+    if validated_data[0] is None: return
+    df_lb_validated, provider_config_validated, lb_rows_validated = validated_data
+    lb_row_to_apply = lb_rows_validated[df_lb_validated.index.get_loc(row_label)]
+
     # --- START OF DEBUGGING LINE ---
     #print("\n" + "="*20 + " DEBUG: RAW DATA FROM EXCEL ROW " + "="*20)
     #print(lb_row_to_apply)
@@ -411,24 +756,44 @@ def handle_apply_single(df_lb: pd.DataFrame, provider_config: pd.Series):
             print("Apply cancelled."); return
     print(f"\nGenerating {tfvar_file} from Excel...")
     tfvars_content = generate_tfvars_content(lb_row_to_apply, provider_config_validated)
-    with open(tfvar_file, 'w') as f: f.write(tfvars_content)
-    if lb_name not in existing_workspaces:
-        run_command(['terraform', 'workspace', 'new', lb_name])
-    else:
-        run_command(['terraform', 'workspace', 'select', lb_name])
-    run_command(['terraform', 'apply', f'-var-file={tfvar_file}', '-auto-approve'])
+    if not write_tfvars_file(tfvar_file, tfvars_content): print("No changes; existing file kept.")
+    # Creates the workspace if needed and selects it, in a single Terraform call (Terraform 1.4+).
+    run_command(['terraform', 'workspace', 'select', '-or-create=true', lb_name])
+    run_command(['terraform', 'apply', f'-var-file={tfvar_file}', '-auto-approve', *terraform_tuning_flags(lb_name)])
+
+def terraform_tuning_flags(lb_name: str, allow_skip_refresh: bool = True) -> List[str]:
+    """Returns the parallelism/refresh flags to append to a plan or apply for the given LB."""
+    flags = [f'-parallelism={TF_PARALLELISM}']
+    if allow_skip_refresh and TF_SKIP_REFRESH and is_deployed(lb_name):
+        flags.append('-refresh=false')
+    return flags
+
+def apply_workspace(lb_name: str) -> Tuple[int, List[str]]:
+    """
+    Runs 'terraform apply' for one LB with its workspace pinned through TF_WORKSPACE,
+    so several applies can run side by side without switching the selected workspace.
+    Output is captured rather than streamed to keep concurrent runs readable, and '-input=false'
+    makes Terraform fail instead of prompting for input nobody would see.
+    """
+    sys.stdout.write(f"  ⏳ Started: {lb_name}\n")  # one write, so lines from parallel workers don't interleave
+    tfvar_file = os.path.join(TFVARS_DIR, f"{lb_name}.tfvars")
+    env = {**os.environ, 'TF_WORKSPACE': lb_name}
+    command = ['terraform', 'apply', f'-var-file={tfvar_file}', '-auto-approve', '-input=false', *terraform_tuning_flags(lb_name)]
+    return run_command(command, env=env, quiet=True)
 
-def handle_apply_all(df_lb: pd.DataFrame, provider_config: pd.Series):
+def handle_apply_all(df_lb: pd.DataFrame, provider_config: pd.Series, lb_rows: List[Any]):
     """Handles applying all pending LBs from the Excel sheet."""
     print_header("Apply All Pending Deployments")
     
     validated_data = run_validation_loop()
     if validated_data[0] is None: return
-    df_lb_validated, provider_config_validated = validated_data
+    df_lb_validated, provider_config_validated, _ = validated_data
 
     existing_workspaces = get_existing_workspaces(quiet=True)
     if existing_workspaces is None: return
-    pending_lbs = [row for row in df_lb_validated.itertuples(index=False) if not is_deployed(row.lb_name)]
+    deployed = scan_deployed_set()
+    df_pending = df_lb_validated[~df_lb_validated['lb_name'].isin(deployed)]
+    pending_lbs = list(preformat_tfvars(df_pending).itertuples(index=False))
     if not pending_lbs:
         print("All load balancers defined in Excel are already deployed. Nothing to do.")
         return
@@ -438,20 +803,36 @@ def handle_apply_all(df_lb: pd.DataFrame, provider_config: pd.Series):
     proceed = input("Do you want to proceed? (y/n): ").lower()
     if proceed != 'y':
         print("Bulk apply cancelled."); return
+    # Files and workspaces are prepared one at a time; only the applies run concurrently.
+    # An LB whose workspace could not be created is reported as failed instead of being applied.
+    failed, ready = [], []
     for lb_row in pending_lbs:
         lb_name = lb_row.lb_name
-        print_header(f"Deploying: {lb_name}")
         tfvar_file = os.path.join(TFVARS_DIR, f"{lb_name}.tfvars")
         print(f"Generating {tfvar_file} from Excel...")
         tfvars_content = generate_tfvars_content(lb_row, provider_config_validated)
-        with open(tfvar_file, 'w') as f: f.write(tfvars_content)
-        if lb_name not in existing_workspaces:
-            run_command(['terraform', 'workspace', 'new', lb_name])
+        if not write_tfvars_file(tfvar_file, tfvars_content): print("No changes; existing file kept.")
+        if lb_name not in existing_workspaces and run_command(['terraform', 'workspace', 'new', lb_name])[0] != 0:
+            failed.append(lb_name)
         else:
-            run_command(['terraform', 'workspace', 'select', lb_name])
-        run_command(['terraform', 'apply', f'-var-file={tfvar_file}', '-auto-approve'])
+            ready.append(lb_name)
+    if ready:
+        print_header(f"Deploying {len(ready)} load balancer(s), up to {APPLY_MAX_WORKERS} at a time")
+    with ThreadPoolExecutor(max_workers=max(1, min(APPLY_MAX_WORKERS, len(ready)))) as executor:
+        futures = {executor.submit(apply_workspace, lb_name): lb_name for lb_name in ready}
+        for future in as_completed(futures):
+            lb_name = futures[future]
+            rc, output_lines = future.result()
+            print_header(f"Deploying: {lb_name}")
+            print("\n".join(output_lines))
+            print("✅ Command finished successfully." if rc == 0 else f"❌ Command failed with exit code {rc}")
+            if rc != 0: failed.append(lb_name)
+    if failed:
+        print(f"\n❌ {len(failed)} deployment(s) failed: {', '.join(sorted(failed))}")
+    else:
+        print(f"\n✅ All {len(pending_lbs)} deployment(s) applied successfully.")
 
-def handle_destroy(df_lb: pd.DataFrame, provider_config: pd.Series):
+def handle_destroy(df_lb: pd.DataFrame, provider_config: pd.Series, lb_rows: List[Any]):
     print_header("Destroy a Load Balancer")
     existing_workspaces = get_existing_workspaces(quiet=True)
     if existing_workspaces is None: return
@@ -467,27 +848,27 @@ def handle_destroy(df_lb: pd.DataFrame, provider_config: pd.Series):
         if input("Destroy successful. Delete workspace and .tfvars file? (y/n): ").lower() == 'y':
             run_command(['terraform', 'workspace', 'select', 'default'])
             run_command(['terraform', 'workspace', 'delete', workspace_to_destroy])
-            if os.path.exists(tfvar_file): os.remove(tfvar_file)
+            try: os.remove(tfvar_file)
+            except FileNotFoundError: pass
             print(f"🧹 Workspace '{workspace_to_destroy}' and its .tfvars file removed.")
 
-def handle_list_deployments(df_lb: pd.DataFrame, provider_config: pd.Series):
+def handle_list_deployments(df_lb: pd.DataFrame, provider_config: pd.Series, lb_rows: List[Any]):
     print_header("Deployment Status")
     print(f"{'Status':<15} {'Load Balancer Name':<30} {'Domains'}")
     print("-" * 70)
-    for index, row in df_lb.iterrows():
-        lb_name = row['lb_name']
-        domains = row.get('domains', 'N/A')
-        status = "✅ Deployed" if is_deployed(lb_name) else "📝 Pending"
+    deployed = scan_deployed_set()
+    domains_column = column_or_none(df_lb, 'domains').fillna('N/A')
+    for lb_name, domains in zip(df_lb['lb_name'].to_numpy(dtype=object), domains_column.to_numpy(dtype=object)):
+        status = "✅ Deployed" if lb_name in deployed else "📝 Pending"
         print(f"{status:<15} {lb_name:<30} {domains}")
 
-def handle_view_config(df_lb: pd.DataFrame, provider_config: pd.Series):
+def handle_view_config(df_lb: pd.DataFrame, provider_config: pd.Series, lb_rows: List[Any]):
     print_header("View Configuration from Excel")
-    lb_rows = list(df_lb.itertuples(index=False))
     lb_row_to_view = prompt_for_selection(lb_rows, "Select an LB to view:", "lb_name")
     if lb_row_to_view is None: return
     display_config(lb_row_to_view)
 
-def handle_plan(df_lb: pd.DataFrame, provider_config: pd.Series):
+def handle_plan(df_lb: pd.DataFrame, provider_config: pd.Series, lb_rows: List[Any]):
     print_header("Check Deployment Status (Plan)")
     existing_workspaces = get_existing_workspaces(quiet=True)
     if existing_workspaces is None: return
@@ -498,23 +879,24 @@ def handle_plan(df_lb: pd.DataFrame, provider_config: pd.Series):
     if workspace_to_check is None: return
     tfvar_file = os.path.join(TFVARS_DIR, f"{workspace_to_check}.tfvars")
     run_command(['terraform', 'workspace', 'select', workspace_to_check])
-    run_command(['terraform', 'plan', f'-var-file={tfvar_file}'])
+    run_command(['terraform', 'plan', f'-var-file={tfvar_file}', *terraform_tuning_flags(workspace_to_check, allow_skip_refresh=False)])
 
-def handle_refresh_tfvars(df_lb: pd.DataFrame, provider_config: pd.Series):
+def handle_refresh_tfvars(df_lb: pd.DataFrame, provider_config: pd.Series, lb_rows: List[Any]):
     print_header("Refresh .tfvars File from Excel")
     print("This will update a .tfvars file based on the Excel sheet without applying changes.")
-    lb_rows = list(df_lb.itertuples(index=False))
     lb_row_to_refresh = prompt_for_selection(lb_rows, "Select an LB to refresh:", "lb_name")
     if lb_row_to_refresh is None: return
     lb_name = lb_row_to_refresh.lb_name
     tfvar_file = os.path.join(TFVARS_DIR, f"{lb_name}.tfvars")
     print(f"\nGenerating {tfvar_file} from the latest Excel data...")
     tfvars_content = generate_tfvars_content(lb_row_to_refresh, provider_config)
-    with open(tfvar_file, 'w') as f: f.write(tfvars_content)
-    print(f"✅ Successfully refreshed '{tfvar_file}'.")
+    if write_tfvars_file(tfvar_file, tfvars_content):
+        print(f"✅ Successfully refreshed '{tfvar_file}'.")
+    else:
+        print(f"✅ '{tfvar_file}' is already up to date with Excel.")
     print("Run 'Check Status (Plan)' or 'Apply' to see or deploy the changes.")
 
-def handle_export(df_lb: pd.DataFrame, provider_config: pd.Series):
+def handle_export(df_lb: pd.DataFrame, provider_config: pd.Series, lb_rows: List[Any]):
     print_header("Export Deployments")
     existing_workspaces = get_existing_workspaces(quiet=True)
     if existing_workspaces is None: return
@@ -529,23 +911,35 @@ def handle_export(df_lb: pd.DataFrame, provider_config: pd.Series):
     proceed = input("Do you want to proceed? (y/n): ").lower()
     if proceed != 'y':
         print("Export cancelled."); return
+    import zipfile
     try:
-        with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED, compresslevel=EXPORT_COMPRESSLEVEL) as zipf:
             print("\nExporting files...")
+            # One directory scan instead of an exists() check per workspace; a missing
+            # tfvars directory just means there are no .tfvars files to export.
+            try:
+                tfvars_present = {entry.name for entry in os.scandir(TFVARS_DIR) if entry.is_file()}
+            except FileNotFoundError:
+                tfvars_present = set()
+            entries = []  # (workspace, arcname, path)
             for ws_name in active_ws:
-                tfvar_file = os.path.join(TFVARS_DIR, f"{ws_name}.tfvars")
-                if os.path.exists(tfvar_file):
-                    zipf.write(tfvar_file, arcname=os.path.join(ws_name, f"{ws_name}.tfvars"))
-                state_file_path = os.path.join('terraform.tfstate.d', ws_name, 'terraform.tfstate')
-                if os.path.exists(state_file_path):
-                    zipf.write(state_file_path, arcname=os.path.join(ws_name, 'terraform.tfstate'))
-                else:
-                    print(f"  - Warning: State file not found for workspace '{ws_name}' at {state_file_path}")
+                if f"{ws_name}.tfvars" in tfvars_present:
+                    entries.append((ws_name, os.path.join(ws_name, f"{ws_name}.tfvars"), os.path.join(TFVARS_DIR, f"{ws_name}.tfvars")))
+                entries.append((ws_name, os.path.join(ws_name, 'terraform.tfstate'), os.path.join(STATE_DIR, ws_name, 'terraform.tfstate')))
+            # Files are read in parallel; ZipFile is not thread-safe, so entries are written here in order.
+            with ThreadPoolExecutor(max_workers=EXPORT_READ_WORKERS) as executor:
+                contents = executor.map(read_export_entry, [path for _, _, path in entries], [arcname for _, arcname, _ in entries])
+                for (ws_name, arcname, path), entry in zip(entries, contents):
+                    if entry is not None:
+                        zinfo, data = entry
+                        zipf.writestr(zinfo, data, compress_type=zipfile.ZIP_DEFLATED, compresslevel=EXPORT_COMPRESSLEVEL)
+                    elif arcname.endswith('terraform.tfstate'):
+                        print(f"  - Warning: State file not found for workspace '{ws_name}' at {path}")
         print(f"✅ Successfully created export bundle: {zip_filename}")
     except Exception as e:
         print(f"❌ Failed to create export bundle. Error: {e}")
 
-def handle_validate(df_lb: pd.DataFrame, provider_config: pd.Series):
+def handle_validate(df_lb: pd.DataFrame, provider_config: pd.Series, lb_rows: List[Any]):
     """Handles the Excel Validation action."""
     print_header("Validating Excel Configuration")
     errors = validate_dataframe(df_lb)
@@ -576,11 +970,11 @@ def main():
         '7': ("Refresh .tfvars File from Excel", handle_refresh_tfvars),
         '8': ("Export Deployments", handle_export),
         '9': ("Validate Excel Configuration", handle_validate),
-        '10': ("Exit", lambda df, pc: sys.exit("👋 Exiting."))
+        '10': ("Exit", lambda df, pc, rows: sys.exit("👋 Exiting."))
     }
 
     while True:
-        df_lb, provider_config = load_data()
+        df_lb, provider_config, lb_rows = load_data()
         if df_lb is None:
             input("Please fix the Excel file and press Enter to try again...")
             continue
@@ -591,7 +985,7 @@ def main():
         
         handler_tuple = menu_options.get(choice)
         if handler_tuple:
-            handler_tuple[1](df_lb, provider_config)
+            handler_tuple[1](df_lb, provider_config, lb_rows)
         else:
             print("❌ Invalid choice, please try again.")
         